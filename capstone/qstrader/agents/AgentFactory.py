@@ -3,7 +3,7 @@ import importlib
 import common as common
 from dateutil import parser
 from environment.environment import Agent as Agent
-from common.compat import queue
+from common.compat import FastQueue
 from smarttrader.price_handler.price_parser import PriceParser
 from smarttrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
 from smarttrader.strategy import Strategies
@@ -15,6 +15,15 @@ class AgentFactory(Agent):
     def getLearningHandler(self) :
         return self.learningHandler
 
+    def on_bar(self, event):
+        """
+        Runs the strategy, portfolio valuation and statistics of this
+        agent on a new tick or bar, in one call from the backtest.
+        """
+        self.strategy.calculate_signals(event, self)
+        self.portfolio_handler.update_portfolio_value()
+        self.statistics.update(event.time, self.portfolio_handler)
+
     def __init__(self, env, context, config, indicators, strategiesDict, instanceDict) :
 
         #testing, filename,
@@ -59,7 +68,7 @@ class AgentFactory(Agent):
         self.tickers = [t for t in ticketWeights.keys()]
 
         # Set up variables needed for backtest
-        self.events_queue = queue.Queue()
+        self.events_queue = FastQueue()
 
         self.csv_dir = config.CSV_DATA_DIR
         self.initial_equity = PriceParser.parse(equity)
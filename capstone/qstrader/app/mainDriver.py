@@ -88,7 +88,8 @@ if __name__ == "__main__":
 
                             print filename
 
-                            results = backtest.simulate_trading(filename=filename,testing=False)
+                            results = backtest.simulate_trading(filename=filename,
+                                                                verbose=True, plot=True)
 
                             if os.path.isfile("out.log") :
                                 shutil.copy("out.log", logfileName)
@@ -48,7 +48,7 @@ if __name__ == "__main__":
 
             backtest = Backtest(agent)
 
-            results = backtest.simulate_trading(filename="../data/results/"+instance.replace(".","_")+"_"+strategy.replace(".","_"),testing=False)
+            results = backtest.simulate_trading(filename="../data/results/"+instance.replace(".","_")+"_"+strategy.replace(".","_"),verbose=True,plot=True)
 
         print "----------End---------------"
 
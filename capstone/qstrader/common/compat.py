@@ -1,6 +1,7 @@
 # flake8: noqa
 
 import sys
+from collections import deque
 
 PY2 = sys.version_info[0] == 2
 PY3 = (sys.version_info[0] >= 3)
@@ -10,7 +11,32 @@ if PY2:
 else:  # PY3
     import queue
 
+
+class FastQueue(deque):
+    """
+    A deque standing in for queue.Queue in the single threaded backtest,
+    without the locking. put and get(False) behave as they do on a Queue,
+    so the handlers that produce events need not change.
+    """
+    put = deque.append
+
+    def get(self, block=True, timeout=None):
+        if self:
+            return self.popleft()
+        raise queue.Empty
+
+
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional: fall back to running the decorated
+    # functions as plain Python, with the same call signature
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
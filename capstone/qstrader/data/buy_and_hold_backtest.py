@@ -1,6 +1,6 @@
 import click
 from common import settings
-from common.compat import queue
+from common.compat import FastQueue
 from portfolio.portfolio_handler import PortfolioHandler
 from price_handler.price_parser import PriceParser
 from qstrader.position_sizer.fixed import FixedPositionSizer
@@ -17,7 +17,7 @@ from smarttrader.statistics import SimpleStatistics
 def run(config, testing, tickers, filename):
 
     # Set up variables needed for backtest
-    events_queue = queue.Queue()
+    events_queue = FastQueue()
     csv_dir = "./"
     initial_equity = PriceParser.parse(500000.00)
 
@@ -60,7 +60,7 @@ def run(config, testing, tickers, filename):
         position_sizer, risk_manager,
         statistics, initial_equity
     )
-    results = backtest.simulate_trading(testing=testing)
+    results = backtest.simulate_trading(plot=not testing)
     statistics.save(filename)
     return results
 
@@ -1,9 +1,11 @@
 from __future__ import print_function
 
-from enum import Enum
+from enum import IntEnum
 
 
-EventType = Enum("EventType", "TICK BAR SIGNAL ORDER FILL")
+# An IntEnum hashes and compares as a plain int, which keeps the
+# backtest dispatch on event.type cheap
+EventType = IntEnum("EventType", "TICK BAR SIGNAL ORDER FILL")
 
 
 class Event(object):
@@ -16,6 +16,12 @@ class IBSimulatedExecutionHandler(AbstractExecutionHandler):
     handler.
     """
 
+    # US Fixed pricing: a rate per share, with a minimum per order and
+    # a maximum as a fraction of the trade value
+    COMMISSION_PER_SHARE = 0.005
+    MIN_COMMISSION = 1.0
+    MAX_COMMISSION_PCT = 0.5
+
     def __init__(self, events_queue, price_handler, compliance=None):
         """
         Initialises the handler, setting the event queue
@@ -36,8 +42,8 @@ class IBSimulatedExecutionHandler(AbstractExecutionHandler):
         https://www.interactivebrokers.co.uk/en/index.php?f=1590&p=stocks1
         """
         commission = min(
-            0.5 * fill_price * quantity,
-            max(1.0, 0.005 * quantity)
+            self.MAX_COMMISSION_PCT * fill_price * quantity,
+            max(self.MIN_COMMISSION, self.COMMISSION_PER_SHARE * quantity)
         )
         return PriceParser.parse(commission)
 
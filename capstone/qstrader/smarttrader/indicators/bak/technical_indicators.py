@@ -14,10 +14,14 @@ Features:
     Simple Moving Average (SMA), Weighted Moving Average (WMA), Exponential
     Moving Average (EMA)
     Bollinger Bands (BB), Bollinger Bandwidth, %B
+    Batched SMA, WMA and EMA over many tickers at once
 
 Dependencies:
 
-It requires numpy.
+It requires numpy, and numba or scipy. The EMA recurrences and the batched kernels are
+compiled with numba when it is installed. Without numba the EMA recurrences
+run as a scipy.signal.lfilter IIR filter, and the batched functions call the
+vectorised indicator on each row.
 This module was tested under Windows with Python 2.7.3 and numpy 1.6.1.
 """
 
@@ -25,9 +29,40 @@ This module was tested under Windows with Python 2.7.3 and numpy 1.6.1.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    # only the EMA fallback below needs scipy
+    from scipy.signal import lfilter
 
-def roc(prices, period=21):
+    # Same no-op njit as common.compat, kept here because this module is
+    # also imported on its own, outside the qstrader package
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+# Number of window values _rolling_mean_std takes the std dev of at once
+_STD_BLOCK_SIZE = 1 << 16
+
+
+def _check_prices(prices, period, dtype=np.float64):
+    prices = np.asarray(prices, dtype=dtype)
+
+    if len(prices) < period:
+        # show error message
+        raise ValueError('Error: num_prices < period')
+
+    return prices
+
+
+def roc(prices, period=21, dtype=np.float64):
     """
     The Rate-of-Change (ROC) indicator, a.k.a. Momentum, is a pure momentum
     oscillator that measures the percent change in price from one period to the
@@ -49,6 +84,7 @@ def roc(prices, period=21):
     Input:
       prices ndarray
       period int > 1 and < len(prices) (optional and defaults to 21)
+      dtype float dtype to compute in (optional and defaults to float64)
 
     Output:
       rocs ndarray
@@ -66,25 +102,76 @@ def roc(prices, period=21):
      -4.31308173 -3.24341092]
     """
 
-    num_prices = len(prices)
+    prices = _check_prices(prices, period, dtype)
 
-    if num_prices < period:
-        # show error message
-        raise SystemExit('Error: num_prices < period')
+    num_prices = len(prices)
 
     roc_range = num_prices - period
 
-    rocs = np.zeros(roc_range)
-
-    for idx in range(roc_range):
-        rocs[idx] = ((prices[idx + period] - prices[idx]) / prices[idx]) * 100
+    rocs = (prices[period:] / prices[:roc_range] - 1.0) * 100.0
 
     return rocs
 
 
+def _nonfinite_windows(finite, period):
+    """
+    Which windows of period values along the last axis hold a NaN or
+    infinite value, from a running count of the non-finite ones.
+    """
+    shape = finite.shape[:-1] + (finite.shape[-1] + 1,)
+    counts = np.zeros(shape, dtype=np.intp)
+    np.cumsum(~finite, axis=-1, out=counts[..., 1:])
+    return counts[..., period:] - counts[..., :-period] > 0
+
 
+def _rolling_mean_std(prices, period, with_std=True, dtype=np.float64):
+    """
+    Mean and (population) standard deviation of every window of period
+    prices, shared by sma, bb and ma_env.
+
+    The window means are differences of running sums of the prices,
+    centred first on their finite mean so the sums stay small. Non-finite
+    prices count as 0 in the running sum, and only the windows that hold
+    one are set to NaN, as a per-window sum would. The std dev is not taken
+    from running sums of squares, which cancel catastrophically on long
+    trending series, but two-pass over strided (no copy) views of the
+    windows, a block of rows at a time so the temporaries stay near
+    _STD_BLOCK_SIZE values.
+    Everything is computed in float64, only the results are cast to dtype.
 
-def sma(prices, period):
+    Output:
+      (means, std_devs) ndarrays, std_devs is None when with_std is False
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    finite = np.isfinite(prices)
+    offset = prices[finite].mean() if finite.any() else 0.0
+    centred = prices - offset
+
+    cs = np.empty(len(centred) + 1, dtype=np.float64)
+    cs[0] = 0
+    np.cumsum(np.where(finite, centred, 0), out=cs[1:])
+    mean = (cs[period:] - cs[:-period]) / period
+    if not finite.all():
+        mean[_nonfinite_windows(finite, period)] = np.nan
+
+    std_dev = None
+    if with_std:
+        num_windows = len(mean)
+        std_dev = np.empty(num_windows, dtype=dtype)
+        stride = centred.strides[0]
+        block = max(1, _STD_BLOCK_SIZE // period)
+        for start in range(0, num_windows, block):
+            rows = min(block, num_windows - start)
+            windows = as_strided(
+                centred[start:], shape=(rows, period),
+                strides=(stride, stride)
+            )
+            std_dev[start:start + rows] = windows.std(axis=1)
+
+    return (mean + offset).astype(dtype, copy=False), std_dev
+
+
+def sma(prices, period, dtype=np.float64):
     """
     Simple Moving Average (SMA) are used to smooth the data in an array to help
     eliminate noise and identify trends.
@@ -104,6 +191,7 @@ def sma(prices, period):
     Input:
       prices ndarray
       period int > 1 and < len(prices)
+      dtype float dtype to compute in (optional and defaults to float64)
 
     Output:
       smas ndarray
@@ -123,31 +211,14 @@ def sma(prices, period):
       23.432  23.277  23.131]
     """
 
-    num_prices = len(prices)
+    prices = _check_prices(prices, period, dtype)
 
-    if num_prices < period:
-        # show error message
-        raise SystemExit('Error: num_prices < period')
-
-    sma_range = num_prices - period + 1
-
-    smas = np.zeros(sma_range)
-
-    # only required for the commented code below
-    #k = period
-
-    for idx in range(sma_range):
-        # this is the code, but using np.mean below is faster and simpler
-        #for period_num in range(period):
-        #    smas[idx] += prices[idx + period_num]
-        #smas[idx] /= k
-
-        smas[idx] = np.mean(prices[idx:idx + period])
+    smas, _ = _rolling_mean_std(prices, period, with_std=False, dtype=dtype)
 
     return smas
 
 
-def wma(prices, period):
+def wma(prices, period, dtype=np.float64):
     """
     Weighted Moving Average (WMA) is a type of moving average that assigns a
     higher weighting to recent price data.
@@ -169,6 +240,7 @@ def wma(prices, period):
     Input:
       prices ndarray
       period int > 1 and < len(prices)
+      dtype float dtype to compute in (optional and defaults to float64)
 
     Output:
       wmas ndarray
@@ -183,26 +255,18 @@ def wma(prices, period):
     [ 80.73333333  70.46666667  64.06666667]
     """
 
-    num_prices = len(prices)
-
-    if num_prices < period:
-        # show error message
-        raise SystemExit('Error: num_prices < period')
-
-    wma_range = num_prices - period + 1
-
-    wmas = np.zeros(wma_range)
+    prices = _check_prices(prices, period, dtype)
 
     k = (period * (period + 1)) / 2.0
 
     # only required for the commented code below
     #w = 2 / float(period + 1)
 
-    for idx in range(wma_range):
-        for period_num in range(period):
-            weight = period_num + 1
-            wmas[idx] += prices[idx + period_num] * weight
-        wmas[idx] /= k
+    # weights 1..n, oldest to most recent; np.convolve flips the kernel, so it
+    # is passed reversed to keep the weight n on the most recent price
+    weights = np.arange(1, period + 1, dtype=dtype)
+
+    wmas = np.convolve(prices, weights[::-1], mode='valid') / k
 
     # this is the code for the second formula, but I think the first is simpler
     # to understand
@@ -221,7 +285,105 @@ def wma(prices, period):
     return wmas
 
 
-def ema(prices, period, ema_type=0):
+@njit(fastmath=True, cache=True)
+def _ema0(prices, period):
+    """
+    EMA type 0 recurrence, seeded with the mean of the oldest period.
+    """
+    num_prices = len(prices)
+
+    ema_range = num_prices - period + 1
+
+    emas = np.zeros(ema_range, dtype=prices.dtype)
+
+    emas[0] = np.mean(prices[:period])
+
+    w = 2 / float(period + 1)
+
+    # only required for the 4th formula
+    #w = 1 - 2 / float(period + 1)
+
+    # the 2nd formula: one multiply-add per step on the serial recurrence
+    for idx in range(1, ema_range):
+        prev = emas[idx - 1]
+        emas[idx] = prev + w * (prices[idx + period - 1] - prev)
+
+        # or with the 1st formula
+        #emas[idx] = w * prices[idx + period - 1] + (1 - w) * emas[idx - 1]
+
+        # or with the 4th formula
+        #emas[idx] = w * emas[idx - 1] + (1 - w) * prices[idx + period - 1]
+
+    return emas
+
+
+@njit(fastmath=True, cache=True)
+def _ema1(prices, period):
+    """
+    EMA type 1 recurrence, seeded with the oldest price.
+    """
+    ema_range = len(prices)
+
+    emas = np.zeros(ema_range, dtype=prices.dtype)
+
+    emas[0] = prices[0]
+
+    w = 2 / float(period + 1)
+
+    # only required for the 4th formula
+    #w = 1 - 2 / float(period + 1)
+
+    # the 2nd formula: one multiply-add per step on the serial recurrence
+    for idx in range(1, ema_range):
+        prev = emas[idx - 1]
+        emas[idx] = prev + w * (prices[idx] - prev)
+
+        # or with the 1st formula
+        #emas[idx] = w * prices[idx] + (1 - w) * emas[idx - 1]
+
+        # or with the 4th formula
+        #emas[idx] = w * emas[idx - 1] + (1 - w) * prices[idx]
+
+    return emas
+
+
+def _ema_lfilter(prices, period, init):
+    """
+    EMA recurrence EMAn = w.Pn + (1 - w).EMAn-1 seeded with init, run as
+    the first order IIR filter it is: b = [w], a = [1, -(1 - w)].
+
+    Returns init followed by one value per price.
+    """
+    w = 2 / float(period + 1)
+
+    emas = np.empty(len(prices) + 1, dtype=prices.dtype)
+    emas[0] = init
+    # the filter state (1 - w).init stands in for the seed EMA0
+    emas[1:], _ = lfilter([w], [1.0, -(1.0 - w)], prices, zi=[(1.0 - w) * init])
+
+    return emas
+
+
+def _ema2(prices, period):
+    """
+    EMA type 2, the geometrically weighted sum over each window.
+
+    The weights are fixed, so this is a single FIR filter over the prices.
+    """
+    w = 2 / float(period + 1)
+
+    k = 1 / float(1 - w)
+
+    # w^0 applies to the most recent price of the window, w^(n-1) to the
+    # oldest; np.convolve flips the kernel, which gives exactly that order
+    weights = (w ** np.arange(period)).astype(prices.dtype)
+
+    emas = np.convolve(prices, weights, mode='valid') / k
+
+    return emas
+
+
+def ema(prices, period, ema_type=0, dtype=np.float64):
     """
     Exponencial Moving Average (EMA) are used to smooth the data in an array to
     help eliminate noise and identify trends.
@@ -261,6 +423,7 @@ def ema(prices, period, ema_type=0):
       prices ndarray
       period int > 1 and < len(prices)
       ema_type can be 0, 1 or 2
+      dtype float dtype to compute in (optional and defaults to float64)
 
     Output:
       emas ndarray
@@ -295,75 +458,28 @@ def ema(prices, period, ema_type=0):
       22.23310448]
     """
 
-    num_prices = len(prices)
-
-    if num_prices < period:
-        # show error message
-        raise SystemExit('Error: num_prices < period')
+    prices = _check_prices(prices, period, dtype)
 
     if ema_type == 0:  # 1st value is the average of the period
-        ema_range = num_prices - period + 1
-
-        emas = np.zeros(ema_range)
-
-        emas[0] = np.mean(prices[:period])
-
-        w = 2 / float(period + 1)
-
-        # only required for the 4th formula
-        #w = 1 - 2 / float(period + 1)
-
-        for idx in range(1, ema_range):
-            emas[idx] = w * prices[idx + period - 1] + (1 - w) * emas[idx - 1]
-
-            # or with the 2nd formula
-            #emas[idx] = emas[idx - 1] + w * ((prices[idx + period - 1] -
-            #                                 emas[idx - 1]))
-
-            # or with the 4th formula
-            #emas[idx] = w * emas[idx - 1] + (1 - w) * prices[idx + period - 1]
+        if HAS_NUMBA:
+            emas = _ema0(prices, period)
+        else:
+            emas = _ema_lfilter(prices[period:], period,
+                                np.mean(prices[:period]))
 
     elif ema_type == 1:  # 1st value is the 1st price
-        ema_range = num_prices
-
-        emas = np.zeros(ema_range)
-
-        emas[0] = prices[0]
-
-        w = 2 / float(period + 1)
-
-        # only required for the 4th formula
-        #w = 1 - 2 / float(period + 1)
-
-        for idx in range(1, ema_range):
-            emas[idx] = w * prices[idx] + (1 - w) * emas[idx - 1]
-
-            # or with the 2nd formula
-            #emas[idx] = emas[idx - 1] + w * (prices[idx] - emas[idx - 1])
-
-            # or with the 4th formula
-            #emas[idx] = w * emas[idx - 1] + (1 - w) * prices[idx]
+        if HAS_NUMBA:
+            emas = _ema1(prices, period)
+        else:
+            emas = _ema_lfilter(prices[1:], period, prices[0])
 
     else:
-        ema_range = num_prices - period + 1
-
-        emas = np.zeros(ema_range)
-
-        w = 2 / float(period + 1)
-
-        k = 1 / float(1 - w)
-
-        for idx in range(ema_range):
-            for period_num in range(period):
-                # this runs the prices backwards to comply with the formula
-                emas[idx] += w**period_num * \
-                    prices[idx + period - period_num - 1]
-            emas[idx] /= k
+        emas = _ema2(prices, period)
 
     return emas
 
 
-def ma_env(prices, period, percent, ma_type=0):
+def ma_env(prices, period, percent, ma_type=0, dtype=np.float64):
     """
     Moving Average Envelopes are percentage-based envelopes set above and below
     a moving average.
@@ -385,6 +501,7 @@ def ma_env(prices, period, percent, ma_type=0):
       period int > 1 and < len(prices)
       percent float > 0.00 and < 1.00
       ma_type 0=EMA type 0, 1=EMA type 1, 2=EMA type 2, 3=WMA, 4=SMA
+      dtype float dtype to compute in (optional and defaults to float64)
 
     Output:
       ma_envs ndarray with upper, middle, lower bands, range and %B
@@ -425,43 +542,45 @@ def ma_env(prices, period, percent, ma_type=0):
      [ 100.15445      91.0495       81.94455      18.2099        0.54121385]]
     """
 
-    num_prices = len(prices)
+    prices = _check_prices(prices, period, dtype)
 
-    if num_prices < period:
-        # show error message
-        raise SystemExit('Error: num_prices < period')
+    num_prices = len(prices)
 
     ma_env_range = num_prices - period + 1
 
     # 3 bands, range and %B
-    ma_envs = np.zeros((ma_env_range, 5))
+    ma_envs = np.zeros((ma_env_range, 5), dtype=dtype)
 
     if 0 <= ma_type <= 2:  # EMAs
-        ma = ema(prices, period, ema_type=ma_type)
+        ma = ema(prices, period, ema_type=ma_type, dtype=dtype)
 
     elif ma_type == 3:  # WMA
-        ma = wma(prices, period)
+        ma = wma(prices, period, dtype=dtype)
 
     else:  # SMA
-        ma = sma(prices, period)
+        ma = sma(prices, period, dtype=dtype)
+
+    # EMA type 1 has one value per price, only the first ma_env_range are used
+    ma = ma[:ma_env_range]
 
-    for idx in range(ma_env_range):
-        # upper, middle, lower bands, range and %B
-        ma_envs[idx, 0] = ma[idx] + (ma[idx] * percent)
-        ma_envs[idx, 1] = ma[idx]
-        ma_envs[idx, 2] = ma[idx] - (ma[idx] * percent)
-        ma_envs[idx, 3] = ma_envs[idx, 0] - ma_envs[idx, 2]
-        ma_envs[idx, 4] = (prices[idx] - ma_envs[idx, 2]) / ma_envs[idx, 3]
+    # upper, middle, lower bands, range and %B
+    ma_envs[:, 0] = ma + (ma * percent)
+    ma_envs[:, 1] = ma
+    ma_envs[:, 2] = ma - (ma * percent)
+    ma_envs[:, 3] = ma_envs[:, 0] - ma_envs[:, 2]
+    ma_envs[:, 4] = (prices[:ma_env_range] - ma_envs[:, 2]) / ma_envs[:, 3]
 
     return ma_envs
 
 
-def bb(prices, period, num_std_dev=2.0):
+def bb(prices, period, num_std_dev=2.0, dtype=np.float64):
     """
     Bollinger bands (BB) are volatility bands placed above and below a moving
     average.
     Volatility is based on the standard deviation, which changes as volatility
     increases and decreases.
+    The standard deviation is the population one of each period (ddof=0, as
+    np.std), taken two-pass over strided views of the windows.
     The bands automatically widen when volatility increases and narrow when
     volatility decreases.
     This dynamic nature of Bollinger Bands also means they can be used on
@@ -502,6 +621,7 @@ def bb(prices, period, num_std_dev=2.0):
       prices ndarray
       period int > 1 and < len(prices)
       num_std_dev float > 0.0 (optional and defaults to 2.0)
+      dtype float dtype to compute in (optional and defaults to float64)
 
     Output:
       bbs ndarray with upper, middle, lower bands, bandwidth, range and %B
@@ -565,30 +685,186 @@ def bb(prices, period, num_std_dev=2.0):
         6.19313782e+00   6.21182512e-01]]
     """
 
-    num_prices = len(prices)
+    prices = _check_prices(prices, period, dtype)
 
-    if num_prices < period:
-        # show error message
-        raise SystemExit('Error: num_prices < period')
+    num_prices = len(prices)
 
     bb_range = num_prices - period + 1
 
     # 3 bands, bandwidth, range and %B
-    bbs = np.zeros((bb_range, 6))
-
-    simple_ma = sma(prices, period)
+    bbs = np.zeros((bb_range, 6), dtype=dtype)
 
-    for idx in range(bb_range):
-        std_dev = np.std(prices[idx:idx + period])
+    simple_ma, std_dev = _rolling_mean_std(prices, period, dtype=dtype)
 
-        # upper, middle, lower bands, bandwidth, range and %B
-        bbs[idx, 0] = simple_ma[idx] + std_dev * num_std_dev
-        bbs[idx, 1] = simple_ma[idx]
-        bbs[idx, 2] = simple_ma[idx] - std_dev * num_std_dev
-        bbs[idx, 3] = (bbs[idx, 0] - bbs[idx, 2]) / bbs[idx, 1]
-        bbs[idx, 4] = bbs[idx, 0] - bbs[idx, 2]
-        bbs[idx, 5] = (prices[idx] - bbs[idx, 2]) / bbs[idx, 4]
+    # upper, middle, lower bands, bandwidth, range and %B
+    bbs[:, 0] = simple_ma + std_dev * num_std_dev
+    bbs[:, 1] = simple_ma
+    bbs[:, 2] = simple_ma - std_dev * num_std_dev
+    bbs[:, 3] = (bbs[:, 0] - bbs[:, 2]) / bbs[:, 1]
+    bbs[:, 4] = bbs[:, 0] - bbs[:, 2]
+    bbs[:, 5] = (prices[:bb_range] - bbs[:, 2]) / bbs[:, 4]
 
     return bbs
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _sma_batch(prices, period):
+    num_tickers, num_prices = prices.shape
+    sma_range = num_prices - period + 1
+    smas = np.empty((num_tickers, sma_range))
+
+    for row in prange(num_tickers):
+        # running window sum: add the newest price, drop the oldest
+        total = 0.0
+        for idx in range(period):
+            total += prices[row, idx]
+        smas[row, 0] = total / period
+        for idx in range(1, sma_range):
+            total += prices[row, idx + period - 1] - prices[row, idx - 1]
+            smas[row, idx] = total / period
+
+    return smas
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _wma_batch(prices, period):
+    num_tickers, num_prices = prices.shape
+    wma_range = num_prices - period + 1
+    wmas = np.empty((num_tickers, wma_range))
+    k = (period * (period + 1)) / 2.0
+
+    for row in prange(num_tickers):
+        # moving the window one step drops every weight by one, i.e.
+        # subtracts the plain window sum, and adds the newest price at n
+        numerator = 0.0
+        total = 0.0
+        for idx in range(period):
+            numerator += prices[row, idx] * (idx + 1)
+            total += prices[row, idx]
+        wmas[row, 0] = numerator / k
+        for idx in range(1, wma_range):
+            newest = prices[row, idx + period - 1]
+            numerator += period * newest - total
+            total += newest - prices[row, idx - 1]
+            wmas[row, idx] = numerator / k
+
+    return wmas
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _ema_batch(prices, period, ema_type):
+    num_tickers, num_prices = prices.shape
+    if ema_type == 0:
+        ema_range = num_prices - period + 1
+    else:
+        ema_range = num_prices
+    emas = np.empty((num_tickers, ema_range))
+    w = 2 / float(period + 1)
+
+    for row in prange(num_tickers):
+        if ema_type == 0:  # 1st value is the average of the period
+            emas[row, 0] = np.mean(prices[row, :period])
+        else:  # 1st value is the 1st price
+            emas[row, 0] = prices[row, 0]
+        offset = num_prices - ema_range
+        for idx in range(1, ema_range):
+            prev = emas[row, idx - 1]
+            emas[row, idx] = prev + w * (prices[row, idx + offset] - prev)
+
+    return emas
+
+
+def _by_row(indicator, prices, period, *args):
+    # without numba the batch kernels would run as plain Python loops,
+    # so the vectorised indicator is run on each row instead
+    return np.array([indicator(row, period, *args) for row in prices])
+
+
+def _check_batch(prices, period):
+    prices = np.asarray(prices, dtype=np.float64)
+
+    if prices.ndim != 2:
+        # show error message
+        raise ValueError('Error: prices must be (num_tickers, num_prices)')
+
+    if prices.shape[1] < period:
+        # show error message
+        raise ValueError('Error: num_prices < period')
+
+    return prices
+
+
+def sma_batch(prices, period):
+    """
+    SMA of many tickers at once, the same as calling sma on each row.
+
+    The rows are independent, so with numba installed they are computed
+    in parallel across all cores. Without numba each row goes through sma.
+
+    Input:
+      prices ndarray of shape (num_tickers, num_prices)
+      period int > 1 and < num_prices
+
+    Output:
+      smas ndarray of shape (num_tickers, num_prices - period + 1)
+    """
+    prices = _check_batch(prices, period)
+
+    if not HAS_NUMBA:
+        return _by_row(sma, prices, period)
+
+    # the running window sum would carry a NaN to every later window, so
+    # sum with the non-finite prices as 0 and mark their windows after
+    finite = np.isfinite(prices)
+    if finite.all():
+        return _sma_batch(prices, period)
+
+    smas = _sma_batch(np.where(finite, prices, 0), period)
+    smas[_nonfinite_windows(finite, period)] = np.nan
+    return smas
+
+
+def wma_batch(prices, period):
+    """
+    WMA of many tickers at once, the same as calling wma on each row.
+
+    Input:
+      prices ndarray of shape (num_tickers, num_prices)
+      period int > 1 and < num_prices
+
+    Output:
+      wmas ndarray of shape (num_tickers, num_prices - period + 1)
+    """
+    prices = _check_batch(prices, period)
+
+    if not HAS_NUMBA:
+        return _by_row(wma, prices, period)
+
+    return _wma_batch(prices, period)
+
+
+def ema_batch(prices, period, ema_type=0):
+    """
+    EMA of many tickers at once, the same as calling ema on each row.
+
+    Input:
+      prices ndarray of shape (num_tickers, num_prices)
+      period int > 1 and < num_prices
+      ema_type can be 0, 1 or 2
+
+    Output:
+      emas ndarray with one row per ticker
+    """
+    prices = _check_batch(prices, period)
+
+    if ema_type not in (0, 1):
+        # as in ema, every other type is type 2: already a single
+        # convolution per row
+        return _by_row(_ema2, prices, period)
+
+    if not HAS_NUMBA:
+        return _by_row(ema, prices, period, ema_type)
+
+    return _ema_batch(prices, period, ema_type)
+
+
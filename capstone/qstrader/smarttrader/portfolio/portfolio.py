@@ -1,41 +1,170 @@
+import numpy as np
+from numpy import sign
 from smarttrader.position.position import Position
+from smarttrader.price_handler.price_parser import PriceParser
 
 
 class Portfolio(object):
+    """
+    The equity and pnl of the portfolio are revalued on every update,
+    from arrays holding the open positions. The open Position objects
+    themselves are only revalued on demand: call mark_positions()
+    before reading their market_value, unrealised_pnl or realised_pnl.
+    Their quantities are always current.
+    """
+
+    VALUE_QUEUE_LEN = 100
+
     def __init__(self, price_handler, cash):
 
         self.price_handler = price_handler
+        # The price handler type is fixed for a run, so only ask once
+        is_tick = price_handler.istick()
+        # and pick the matching price lookups up front, so marking to
+        # market never branches on the handler type
+        if is_tick:
+            self._get_bid_ask = price_handler.get_best_bid_ask
+            self._get_mids = self._tick_mids
+        else:
+            self._get_bid_ask = self._close_bid_ask
+            self._get_mids = price_handler.get_last_closes
         self.init_cash = cash
         self.equity = cash
         self.cur_cash = cash
         self.positions = {}
         self.closed_positions = []
         self.realised_pnl = 0
+        self.unrealised_pnl = 0
 
-        from collections import deque
-        self.value_queue = deque(maxlen=100 )
+        # The open positions are also held as parallel arrays, row i
+        # belonging to self._tickers[i], so that marking the portfolio
+        # to market is a handful of array operations per update.
+        self._tickers = []
+        self._index = {}
+        self._signed_qty = np.zeros(0, dtype=np.int64)
+        self._cost_basis = np.zeros(0, dtype=np.int64)
+        self._net_incl_comm = np.zeros(0, dtype=np.int64)
+        self._mids = np.zeros(0, dtype=np.int64)
+        # Running sums of the cost basis and net_incl_comm columns; they
+        # only change on a fill, so a revaluation just needs the dot
+        # product of the quantities and prices
+        self._cost_basis_total = 0
+        self._net_incl_comm_total = 0
 
-    def _update_portfolio(self):
+        # Ring buffer of the last VALUE_QUEUE_LEN equity values
+        self._vq = np.empty(self.VALUE_QUEUE_LEN, dtype=np.float64)
+        self._vq_head = 0
+        self._vq_full = False
 
-        self.unrealised_pnl = 0
-        self.equity = self.realised_pnl
-        self.equity += self.init_cash
+    @property
+    def value_queue(self):
+        """
+        The recorded equity values, oldest first.
+        """
+        if self._vq_full:
+            return np.roll(self._vq, -self._vq_head)
+        return self._vq[:self._vq_head]
 
-        for ticker in self.positions:
-            pt = self.positions[ticker]
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
-            pt.update_market_value(bid, ask)
-            self.unrealised_pnl += pt.unrealised_pnl
-            pnl_diff = pt.realised_pnl - pt.unrealised_pnl
-            self.equity += (
-                pt.market_value - pt.cost_basis + pnl_diff
-            )
-            self.value_queue.append(self.equity )
+    def _record_value(self):
+        self._vq[self._vq_head] = self.equity
+        self._vq_head += 1
+        if self._vq_head == self.VALUE_QUEUE_LEN:
+            self._vq_head = 0
+            self._vq_full = True
+
+    def _tick_mids(self, tickers):
+        bids, asks = self.price_handler.get_bids_asks(tickers)
+        return (bids + asks) // 2
+
+    def _close_bid_ask(self, ticker):
+        close_price = self.price_handler.get_last_close(ticker)
+        return close_price, close_price
+
+    def _rebuild_arrays(self):
+        """
+        Rebuild the position arrays after a position is opened or
+        closed, which changes the set of rows.
+        """
+        last_mids = dict(zip(self._tickers, self._mids))
+        self._tickers = list(self.positions)
+        self._index = dict(
+            (ticker, idx) for idx, ticker in enumerate(self._tickers)
+        )
+        num_positions = len(self._tickers)
+        self._signed_qty = np.zeros(num_positions, dtype=np.int64)
+        self._cost_basis = np.zeros(num_positions, dtype=np.int64)
+        self._net_incl_comm = np.zeros(num_positions, dtype=np.int64)
+        self._mids = np.zeros(num_positions, dtype=np.int64)
+        self._cost_basis_total = 0
+        self._net_incl_comm_total = 0
+        for idx, ticker in enumerate(self._tickers):
+            self._mids[idx] = last_mids.get(ticker, 0)
+            self._store_position(ticker)
+
+    def _store_position(self, ticker):
+        """
+        Copy the transaction state of a Position into its array row.
+
+        The market value of a Position is quantity * midpoint * sign(net),
+        so only the signed quantity is needed to revalue it.
+        """
+        pt = self.positions[ticker]
+        idx = self._index[ticker]
+        old_cost_basis = int(self._cost_basis[idx])
+        old_net_incl_comm = int(self._net_incl_comm[idx])
+        self._signed_qty[idx] = pt.quantity * sign(pt.net)
+        self._cost_basis[idx] = pt.cost_basis
+        self._net_incl_comm[idx] = pt.net_incl_comm
+        self._cost_basis_total += int(self._cost_basis[idx]) - old_cost_basis
+        self._net_incl_comm_total += (
+            int(self._net_incl_comm[idx]) - old_net_incl_comm
+        )
+
+    def mark_positions(self):
+        """
+        Push the most recent marked prices onto the open Position
+        objects, for callers that read their market value directly.
+        """
+        for ticker, mid in zip(self._tickers, self._mids):
+            self.positions[ticker].update_market_value(mid, mid)
+
+    def _contribution(self, ticker):
+        """
+        Return the (equity, unrealised pnl) contribution of an open
+        position at its most recent marked price.
+        """
+        idx = self._index[ticker]
+        market_value = int(self._signed_qty[idx] * self._mids[idx])
+        return (
+            market_value + int(self._net_incl_comm[idx]),
+            market_value - int(self._cost_basis[idx])
+        )
+
+    def full_refresh(self):
+        """
+        Revalue every open position at the current prices and
+        recompute the equity and unrealised pnl from scratch.
+        """
+        self._mids = self._get_mids(self._tickers)
+        self._revalue()
+
+    def _revalue(self):
+        """
+        Recompute the equity and unrealised pnl at self._mids.
+        """
+        market_value = int(self._signed_qty.dot(self._mids))
+        # For every position, market_value - cost_basis plus the
+        # realised - unrealised pnl difference is market_value + net_incl_comm
+        self.unrealised_pnl = market_value - self._cost_basis_total
+        self.equity = (
+            self.init_cash + self.realised_pnl +
+            market_value + self._net_incl_comm_total
+        )
+
+    def _update_portfolio(self):
+
+        self.full_refresh()
+        self._record_value()
 
     def _add_position(
         self, action, ticker,
@@ -43,18 +172,20 @@ class Portfolio(object):
     ):
 
         if ticker not in self.positions:
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             position = Position(
                 action, ticker, quantity,
                 price, commission, bid, ask
             )
             self.positions[ticker] = position
-            self._update_portfolio()
+            self._rebuild_arrays()
+            self._mids[self._index[ticker]] = (bid + ask) // 2
+
+            # Only the new position changes the equity, every other
+            # position keeps the value it was last marked at
+            self.equity += position.realised_pnl
+            self.unrealised_pnl += position.unrealised_pnl
+            self._record_value()
         else:
             print(
                 "Ticker %s is already in the positions list. "
@@ -67,23 +198,30 @@ class Portfolio(object):
     ):
 
         if ticker in self.positions:
+            old_equity, old_unrealised = self._contribution(ticker)
             self.positions[ticker].transact_shares(
                 action, quantity, price, commission
             )
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             self.positions[ticker].update_market_value(bid, ask)
 
+            # Swap the old contribution of this ticker for the new one;
+            # a closed position's value moves into realised_pnl instead
+            pt = self.positions[ticker]
+            self.equity += pt.realised_pnl - old_equity
+            self.unrealised_pnl -= old_unrealised
+
             if self.positions[ticker].quantity == 0:
                 closed = self.positions.pop(ticker)
                 self.realised_pnl += closed.realised_pnl
                 self.closed_positions.append(closed)
+                self._rebuild_arrays()
+            else:
+                self._store_position(ticker)
+                self._mids[self._index[ticker]] = (bid + ask) // 2
+                self.unrealised_pnl += pt.unrealised_pnl
 
-            self._update_portfolio()
+            self._record_value()
         else:
             print(
                 "Ticker %s not in the current position list. "
@@ -111,3 +249,32 @@ class Portfolio(object):
                 action, ticker, quantity,
                 price, commission
             )
+
+    def record_fills(self, fills, tickers, last_closes):
+        """
+        Transact the fills of a vectorised backtest, rows of (bar,
+        ticker index, signed quantity, price, commission) in dollars,
+        so that its positions and trades are kept as an event-driven
+        run keeps them. Each fill is marked at its own price, the close
+        it filled at, and the open positions at last_closes at the end.
+        """
+        get_bid_ask = self._get_bid_ask
+        try:
+            for _, idx, quantity, price, commission in fills:
+                price = PriceParser.parse(float(price))
+                self._get_bid_ask = lambda ticker, mark=price: (mark, mark)
+                self.transact_position(
+                    "BOT" if quantity > 0 else "SLD", tickers[int(idx)],
+                    int(abs(quantity)), price,
+                    PriceParser.parse(float(commission))
+                )
+        finally:
+            self._get_bid_ask = get_bid_ask
+
+        closes = dict(zip(tickers, last_closes))
+        self._mids = np.array(
+            [PriceParser.parse(float(closes[ticker]))
+             for ticker in self._tickers],
+            dtype=np.int64
+        )
+        self._revalue()
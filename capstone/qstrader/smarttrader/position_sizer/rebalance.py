@@ -1,7 +1,3 @@
-from math import floor
-
-from smarttrader.price_handler.price_parser import PriceParser
-
 from .base import AbstractPositionSizer
 
 
@@ -44,12 +40,12 @@ class LiquidateRebalancePositionSizer(AbstractPositionSizer):
         else:
             weight = self.ticker_weights[ticker]
             # Determine total portfolio value, work out dollar weight
-            # and finally determine integer quantity of shares to purchase
+            # and finally determine integer quantity of shares to purchase.
+            # Both prices carry the same PRICE_MULTIPLIER, which cancels,
+            # so the division is done on the parsed values directly
             price = portfolio.price_handler.tickers[ticker]["adj_close"]
-            price /= PriceParser.PRICE_MULTIPLIER
-            equity = portfolio.equity / PriceParser.PRICE_MULTIPLIER
-            dollar_weight = weight * equity
-            weighted_quantity = int(floor(dollar_weight / price))
+            dollar_weight = weight * portfolio.equity
+            weighted_quantity = int(dollar_weight // price)
             # Update quantity
             initial_order.quantity = weighted_quantity
         return initial_order
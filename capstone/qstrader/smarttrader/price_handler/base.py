@@ -1,6 +1,18 @@
 from __future__ import print_function
 
 from abc import ABCMeta
+from collections import namedtuple
+
+import numpy as np
+
+
+# A bar stream held as parallel arrays, one entry per bar in stream
+# order: the ticker of each bar as an index into ticker_names, and the
+# prices as PriceParser int64s.
+BarsSoA = namedtuple("BarsSoA", (
+    "tickers", "ticker_names", "opens", "highs",
+    "lows", "closes", "adj_closes", "volumes"
+))
 
 
 class AbstractPriceHandler(object):
@@ -78,6 +90,20 @@ class AbstractTickPriceHandler(AbstractPriceHandler):
             )
             return None, None
 
+    def get_bids_asks(self, tickers):
+        """
+        Returns the most recent bid and ask prices for a list of
+        tickers, as two arrays in the same order as the tickers.
+        """
+        num_tickers = len(tickers)
+        bids = np.zeros(num_tickers, dtype=np.int64)
+        asks = np.zeros(num_tickers, dtype=np.int64)
+        for idx, ticker in enumerate(tickers):
+            ticker_prices = self.tickers[ticker]
+            bids[idx] = ticker_prices["bid"]
+            asks[idx] = ticker_prices["ask"]
+        return bids, asks
+
 
 class AbstractBarPriceHandler(AbstractPriceHandler):
     def istick(self):
@@ -108,3 +134,14 @@ class AbstractBarPriceHandler(AbstractPriceHandler):
                 "available from the YahooDailyBarPriceHandler."
             )
             return None
+
+    def get_last_closes(self, tickers):
+        """
+        Returns the most recent actual (unadjusted) closing prices
+        for a list of tickers, as an array in the same order as the
+        tickers.
+        """
+        return np.array(
+            [self.tickers[ticker]["close"] for ticker in tickers],
+            dtype=np.int64
+        )
@@ -13,9 +13,10 @@ class AbstractGenericHandler(AbstractPriceHandler):
         for ticker in self.tickers_lst:
             self.tickers[ticker] = {}
 
-    def stream_next(self):
+    def stream_next(self, sink=None):
         """
-        Place the next PriceEvent (BarEvent or TickEvent) onto the event queue.
+        Place the next PriceEvent (BarEvent or TickEvent) onto the event queue,
+        or hand it straight to sink when one is given.
         """
         try:
             price_event = next(self.price_event_iterator)
@@ -25,7 +26,10 @@ class AbstractGenericHandler(AbstractPriceHandler):
         except (EmptyTickEvent, EmptyBarEvent):
             return
         self._store_event(price_event)
-        self.events_queue.put(price_event)
+        if sink is not None:
+            sink(price_event)
+        else:
+            self.events_queue.put(price_event)
 
     @property
     def tickers_lst(self):
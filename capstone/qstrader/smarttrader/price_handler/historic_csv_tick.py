@@ -93,9 +93,10 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         tev = TickEvent(ticker, index, bid, ask)
         return tev
 
-    def stream_next(self):
+    def stream_next(self, sink=None):
         """
-        Place the next TickEvent onto the event queue.
+        Place the next TickEvent onto the event queue, or hand it
+        straight to sink when one is given.
         """
         try:
             index, row = next(self.tick_stream)
@@ -105,4 +106,7 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         ticker = row["Ticker"]
         tev = self._create_event(index, ticker, row)
         self._store_event(tev)
-        self.events_queue.put(tev)
+        if sink is not None:
+            sink(tev)
+        else:
+            self.events_queue.put(tev)
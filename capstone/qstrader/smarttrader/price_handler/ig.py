@@ -44,11 +44,15 @@ class IGTickPriceHandler(AbstractTickPriceHandler):
         ask = PriceParser.parse(data["values"]["OFFER"])
         return TickEvent(ticker, index, bid, ask)
 
-    def stream_next(self):
+    def stream_next(self, sink=None):
         """
-        Place the next PriceEvent (BarEvent or TickEvent) onto the event queue.
+        Place the next PriceEvent (BarEvent or TickEvent) onto the event queue,
+        or hand it straight to sink when one is given.
         """
         if self.price_event is not None:
             self._store_event(self.price_event)
-            self.events_queue.put(self.price_event)
+            if sink is not None:
+                sink(self.price_event)
+            else:
+                self.events_queue.put(self.price_event)
             self.price_event = None
@@ -1,10 +1,11 @@
 import os
 
+import numpy as np
 import pandas as pd
 from environment.event import BarEvent
 from smarttrader.price_handler.price_parser import PriceParser
 
-from .base import AbstractBarPriceHandler
+from .base import AbstractBarPriceHandler, BarsSoA
 
 
 class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
@@ -34,7 +35,12 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                 self.subscribe_ticker(ticker)
         self.start_date = start_date
         self.end_date = end_date
-        self.bar_stream = self._merge_sort_ticker_data()
+        bars = self._merge_sort_ticker_data()
+        # The bars are streamed from parallel arrays built once, not
+        # from the DataFrame rows
+        self._bar_index = bars.index
+        self._bars = self._to_soa(bars)
+        self._next_bar = 0
 
     def _open_ticker_price_csv(self, ticker):
         """
@@ -70,13 +76,57 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
             end = df.index.searchsorted(self.end_date)
         # Determine how to slice
         if start is None and end is None:
-            return df.iterrows()
+            return df
         elif start is not None and end is None:
-            return df.ix[start:].iterrows()
+            return df.ix[start:]
         elif start is None and end is not None:
-            return df.ix[:end].iterrows()
+            return df.ix[:end]
         else:
-            return df.ix[start:end].iterrows()
+            return df.ix[start:end]
+
+    def _to_soa(self, df):
+        """
+        Converts the merged bars into a BarsSoA, parsing every price
+        column in one go.
+        """
+        ticker_names, ticker_codes = np.unique(
+            df["Ticker"].values, return_inverse=True
+        )
+
+        def parse(column):
+            return (
+                df[column].values * PriceParser.PRICE_MULTIPLIER
+            ).astype(np.int64)
+
+        return BarsSoA(
+            tickers=ticker_codes.astype(np.int64),
+            ticker_names=list(ticker_names),
+            opens=parse("Open"), highs=parse("High"), lows=parse("Low"),
+            closes=parse("Close"), adj_closes=parse("Adj Close"),
+            volumes=df["Volume"].values.astype(np.int64)
+        )
+
+    def as_ndarray(self):
+        """
+        Returns the whole bar stream at once, for the vectorised
+        backtest: the bar timestamps, the tickers and a
+        (num_bars, num_tickers) float64 array of the close prices,
+        one column per ticker in the same order.
+
+        A ticker without a bar on a date carries its last close
+        forward, dates before its first bar are 0.0.
+        """
+        tickers = list(self.tickers_data)
+        closes = pd.concat(
+            [self.tickers_data[ticker]["Close"] for ticker in tickers],
+            axis=1, keys=tickers
+        ).sort_index()
+        if self.start_date is not None:
+            closes = closes[closes.index >= self.start_date]
+        if self.end_date is not None:
+            closes = closes[closes.index < self.end_date]
+        closes = closes.ffill().fillna(0.0)
+        return closes.index, tickers, closes.values.astype(np.float64)
 
     def subscribe_ticker(self, ticker):
         """
@@ -108,39 +158,37 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                 "as is already subscribed." % ticker
             )
 
-    def _create_event(self, index, period, ticker, row):
+    def _create_event(self, idx, period):
         """
-        Obtain all elements of the bar from a row of dataframe
-        and return a BarEvent
+        Obtain all elements of the bar at position idx of the
+        bar stream and return a BarEvent
         """
-        open_price = PriceParser.parse(row["Open"])
-        high_price = PriceParser.parse(row["High"])
-        low_price = PriceParser.parse(row["Low"])
-        close_price = PriceParser.parse(row["Close"])
-        adj_close_price = PriceParser.parse(row["Adj Close"])
-        volume = int(row["Volume"])
+        bars = self._bars
         bev = BarEvent(
-            ticker, index, period, open_price,
-            high_price, low_price, close_price,
-            volume, adj_close_price
+            bars.ticker_names[bars.tickers[idx]], self._bar_index[idx],
+            period, int(bars.opens[idx]), int(bars.highs[idx]),
+            int(bars.lows[idx]), int(bars.closes[idx]),
+            int(bars.volumes[idx]), int(bars.adj_closes[idx])
         )
         return bev
 
-    def stream_next(self):
+    def stream_next(self, sink=None):
         """
-        Place the next BarEvent onto the event queue.
+        Place the next BarEvent onto the event queue, or hand it
+        straight to sink when one is given.
         """
-        try:
-            index, row = next(self.bar_stream)
-        except StopIteration:
+        idx = self._next_bar
+        if idx == len(self._bar_index):
             self.continue_backtest = False
             return
-        # Obtain all elements of the bar from the dataframe
-        ticker = row["Ticker"]
+        self._next_bar = idx + 1
         period = 86400  # Seconds in a day
-        # Create the tick event for the queue
-        bev = self._create_event(index, period, ticker, row)
+        # Create the bar event for the queue
+        bev = self._create_event(idx, period)
         # Store event
         self._store_event(bev)
-        # Send event to queue
-        self.events_queue.put(bev)
+        # Send event to the sink or the queue
+        if sink is not None:
+            sink(bev)
+        else:
+            self.events_queue.put(bev)
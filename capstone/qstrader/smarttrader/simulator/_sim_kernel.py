@@ -0,0 +1,107 @@
+"""
+The vectorised backtest kernel, as plain Python so that it can be
+compiled either way: Backtest wraps it with njit at import, or it can
+be built ahead of time into the sim_kernel extension module, which
+Backtest then uses instead and so never pays the JIT compile:
+
+    python smarttrader/simulator/_sim_kernel.py
+
+Building requires numba (numba.pycc) and a C compiler; the extension is
+written next to this file.
+"""
+import os
+
+import numpy as np
+
+
+def simulate(prices, signals, initial_equity,
+             per_share, min_commission, max_commission_pct):
+    """
+    Walks the (num_bars, num_tickers) prices and signals of a vectorised
+    backtest, in dollars. A long signal on a flat ticker buys the whole
+    shares that an equal share of the initial equity (or the cash left)
+    affords after commission, an exit signal sells the whole position.
+    Each fill pays per_share commission, at least min_commission and at
+    most max_commission_pct of the trade value, as IB's fixed pricing.
+
+    Returns the equity at every bar and the fills, one row of
+    (bar, ticker, signed quantity, price, commission) each.
+    """
+    num_bars, num_tickers = prices.shape
+    budget = initial_equity / num_tickers
+
+    # A ticker can only fill when its signal turns from long to exit or
+    # back, so counting those turns first bounds the number of fills
+    max_fills = 0
+    for ticker in range(num_tickers):
+        held = False
+        for bar in range(num_bars):
+            signal = signals[bar, ticker]
+            if prices[bar, ticker] <= 0.0:
+                continue
+            if (signal > 0 and not held) or (signal < 0 and held):
+                held = not held
+                max_fills += 1
+
+    cash = initial_equity
+    positions = np.zeros(num_tickers)
+    equity_curve = np.empty(num_bars)
+    fills = np.empty((max_fills, 5))
+    num_fills = 0
+
+    for bar in range(num_bars):
+        for ticker in range(num_tickers):
+            price = prices[bar, ticker]
+            signal = signals[bar, ticker]
+            if signal == 0 or price <= 0.0:
+                continue
+
+            if signal > 0 and positions[ticker] == 0.0:
+                available = min(budget, cash)
+                quantity = np.floor(available / price)
+                # Keep back the commission on that many shares; it only
+                # falls with the quantity, so the fill cannot overdraw
+                reserve = min(
+                    max_commission_pct * price * quantity,
+                    max(min_commission, per_share * quantity)
+                )
+                quantity = np.floor((available - reserve) / price)
+                if quantity <= 0.0:
+                    continue
+            elif signal < 0 and positions[ticker] > 0.0:
+                quantity = -positions[ticker]
+            else:
+                continue
+
+            fee = min(
+                max_commission_pct * price * abs(quantity),
+                max(min_commission, per_share * abs(quantity))
+            )
+            cash -= quantity * price + fee
+            positions[ticker] += quantity
+
+            fills[num_fills, 0] = bar
+            fills[num_fills, 1] = ticker
+            fills[num_fills, 2] = quantity
+            fills[num_fills, 3] = price
+            fills[num_fills, 4] = fee
+            num_fills += 1
+
+        equity = cash
+        for ticker in range(num_tickers):
+            equity += positions[ticker] * prices[bar, ticker]
+        equity_curve[bar] = equity
+
+    return equity_curve, fills[:num_fills]
+
+
+if __name__ == "__main__":
+    from numba.pycc import CC
+
+    cc = CC("sim_kernel")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export(
+        "simulate",
+        "Tuple((f8[:], f8[:, :]))(f8[:, :], i1[:, :], f8, f8, f8, f8)"
+    )(simulate)
+    cc.compile()
@@ -1,12 +1,22 @@
 from __future__ import print_function
 
-from common.compat import queue
+import numpy as np
+from common.compat import njit
 from environment.event import EventType
-from common.PropertyReader import *
-from dateutil import parser
+from smarttrader.execution_handler.ib_simulated import IBSimulatedExecutionHandler
+from smarttrader.price_handler.price_parser import PriceParser
+from smarttrader.simulator import _sim_kernel
+from common.PropertyReader import getPath
 import json
 import smarttrader.indicators.TopoSort as topoSort
 
+try:
+    # The kernel compiled ahead of time by _sim_kernel.py, if built
+    from smarttrader.simulator.sim_kernel import simulate as _simulate
+except ImportError:
+    _simulate = njit(cache=True, fastmath=True)(_sim_kernel.simulate)
+
+
 class Simulator(object):
     def __init__(self, env, size=None, frame_delay=10, update_delay=1.0):
         self.env = env
@@ -41,6 +51,14 @@ class Backtest(object):
     carrying out an event-driven backtest.
     """
 
+    # No per-instance __dict__: the event loop reads these on every event
+    __slots__ = (
+        'filename', 'verbose', 'agent', 'price_handler', 'strategy',
+        'portfolio_handler', 'execution_handler', 'position_sizer',
+        'risk_manager', 'statistics', 'equity', 'events_queue',
+        'indicator_list', 'indicator_dict', '_handlers'
+    )
+
     def __init__(self, agent, price_handler=None,
         strategy=None, portfolio_handler=None,
         execution_handler=None,
@@ -48,25 +66,29 @@ class Backtest(object):
         statistics=None, equity=None)  :
 
         self.filename = None
+        self.verbose = False
 
-        if agent != None :
+        if agent is not None :
 
             self.agent = agent
-            self.price_handler = agent.price_handler
-            self.strategy = agent.strategy
-            self.portfolio_handler = agent.portfolio_handler
-            self.execution_handler = agent.execution_handler
-            self.position_sizer = agent.position_sizer
-            self.risk_manager = agent.risk_manager
-            self.statistics = agent.statistics
-            self.equity = agent.initial_equity
-            self.events_queue = agent.price_handler.events_queue
-            self.cur_time = None
-            self.indicator_list = agent.indicator_list
-            self.indicator_dict = agent.indicator_dict
+            (
+                self.price_handler, self.strategy,
+                self.portfolio_handler, self.execution_handler,
+                self.position_sizer, self.risk_manager,
+                self.statistics, self.equity,
+                self.indicator_list, self.indicator_dict
+            ) = (
+                agent.price_handler, agent.strategy,
+                agent.portfolio_handler, agent.execution_handler,
+                agent.position_sizer, agent.risk_manager,
+                agent.statistics, agent.initial_equity,
+                agent.indicator_list, agent.indicator_dict
+            )
+            self.events_queue = self.price_handler.events_queue
 
         else :
 
+            self.agent = None
             self.price_handler = price_handler
             self.strategy = strategy
             self.portfolio_handler = portfolio_handler
@@ -76,86 +98,152 @@ class Backtest(object):
             self.statistics = statistics
             self.equity = equity
             self.events_queue = price_handler.events_queue
-            self.cur_time = None
 
-    def _run_backtest(self):
+        # Handler for each event type, indexed by the type's int value;
+        # the values start at 1, so slot 0 stays empty
+        self._handlers = [None] * (max(EventType) + 1)
+        self._handlers[EventType.TICK] = self._on_market
+        self._handlers[EventType.BAR] = self._on_market
+        self._handlers[EventType.SIGNAL] = self.portfolio_handler.on_signal
+        self._handlers[EventType.ORDER] = self.execution_handler.execute_order
+        self._handlers[EventType.FILL] = self.portfolio_handler.on_fill
+
+    def _on_market(self, event):
         """
-        Carries out an infinite while loop that polls the
-        events queue and directs each event to either the
-        strategy component of the execution handler. The
-        loop continue until the event queue has been
-        emptied.
+        Updates the indicators, the strategy signals, the portfolio
+        value and the statistics on a new tick or bar.
         """
-        print("Running Backtest...")
-        while self.price_handler.continue_backtest:
+        verbose = self.verbose
+
+        graph = dict()
+        indicatorPath = getPath('strategies.data.path')
+        indicators = json.load(open(indicatorPath + "indicators.dict"))
+        for indicator, value in indicators.iteritems():
+            dependencies = value['dependencies']
+            graph[indicator] = dependencies
+
+        order = topoSort.topological(graph)
+        while True:
             try:
-                event = self.events_queue.get(False)
-            except queue.Empty:
-                self.price_handler.stream_next()
-            else:
-                if event is not None:
-
-                    print ("----------------- Price EVENT Received from market backtest----------------------")
-                    if event.type == EventType.TICK or event.type == EventType.BAR:
-                        self.cur_time = event.time
-
-                        graph = dict()
-                        indicatorPath = getPath('strategies.data.path')
-                        indicators = json.load(open(indicatorPath + "indicators.dict"))
-                        for indicator, value in indicators.iteritems():
-                            dependencies = value['dependencies']
-                            graph[indicator] = dependencies
-
-                        order = topoSort.topological(graph)
-                        while True:
-                            try:
-                                ind = order.pop()
-                                print (self.indicator_dict)
-                                indClass = self.indicator_dict[ind]
-                                indClass.updateIndicators(event, self.agent)
-
-                            except IndexError:
-                                break
-
-                        print("        ***** Processing signals  ----------------------")
-                        self.strategy.calculate_signals(event,self.agent)
-                        print("        ***** Update portfolio  ----------------------")
-                        self.portfolio_handler.update_portfolio_value()
-                        print("        ***** Update Stats  ----------------------")
-                        self.statistics.update(event.time, self.portfolio_handler)
-
-                    elif event.type == EventType.SIGNAL:
-                        self.portfolio_handler.on_signal(event)
-                    elif event.type == EventType.ORDER:
-                        self.execution_handler.execute_order(event)
-                    elif event.type == EventType.FILL:
-                        self.portfolio_handler.on_fill(event)
-                    else:
-                        raise NotImplemented("Unsupported event.type '%s'" % event.type)
-
-                    print("POS after Price Event Processing :", self.agent.portfolio_handler.portfolio.positions)
-
-        print ("Backtest completed. Positions at the End as follows....")
-        print  ("Total rewards for this trial {} is {}".format(self.filename,self.agent.getLearningHandler().getTotalRewards()))
-
-        print ("POS:", self.agent.portfolio_handler.portfolio.positions)
-
-
-    def simulate_trading(self, filename=None,testing=False):
+                ind = order.pop()
+                if verbose:
+                    print (self.indicator_dict)
+                indClass = self.indicator_dict[ind]
+                indClass.updateIndicators(event, self.agent)
+
+            except IndexError:
+                break
+
+        if verbose:
+            print("        ***** Processing signals, portfolio and stats  ----------------------")
+        if self.agent is not None:
+            self.agent.on_bar(event)
+        else:
+            self.strategy.calculate_signals(event,self.agent)
+            self.portfolio_handler.update_portfolio_value()
+            self.statistics.update(event.time, self.portfolio_handler)
+
+    def _dispatch_event(self, event):
+        """
+        Directs an event to the handler for its type.
+        """
+        if self.verbose:
+            print ("----------------- Price EVENT Received from market backtest----------------------")
+        etype = event.type
+        handler = self._handlers[etype]
+        if handler is None:
+            raise NotImplementedError("Unsupported event.type '%s'" % etype)
+        handler(event)
+
+        if self.verbose:
+            print("POS after Price Event Processing :", self.portfolio_handler.portfolio.positions)
+
+    def _run_backtest(self):
+        """
+        Carries out a while loop that streams each new tick or
+        bar from the price handler straight to its handler.
+        The signal, order and fill events that follow from it
+        are queued by the other components, and are drained
+        in order before the next bar. The loop continues until
+        the price handler runs out of data.
+        """
+        # Bind everything the loop touches to locals up front, the
+        # loop runs once per bar
+        price_handler = self.price_handler
+        stream_next = price_handler.stream_next
+        events_queue = self.events_queue
+        popleft = events_queue.popleft
+        dispatch_event = self._dispatch_event
+        verbose = self.verbose
+        while price_handler.continue_backtest:
+            stream_next(dispatch_event)
+            while events_queue:
+                dispatch_event(popleft())
+
+        if verbose:
+            print ("Backtest completed. Positions at the End as follows....")
+            print  ("Total rewards for this trial {} is {}".format(self.filename,self.agent.getLearningHandler().getTotalRewards()))
+
+            print ("POS:", self.agent.portfolio_handler.portfolio.positions)
+
+
+    def _run_backtest_vectorized(self):
+        """
+        Runs the whole backtest over arrays instead of events, for
+        strategies that set vectorized: the strategy computes every
+        signal up front and _simulate trades them in one compiled loop,
+        filling at the close with the simulated IB commission.
+        The equity curve and the closes go to the statistics in a
+        single update, and the fills to the portfolio, which keeps the
+        positions and trades the statistics report.
+        """
+        timestamps, tickers, prices = self.price_handler.as_ndarray()
+        signals = self.strategy.calculate_signals_vectorized(
+            prices, self.agent
+        )
+        initial_equity = self.equity / float(PriceParser.PRICE_MULTIPLIER)
+        ib = IBSimulatedExecutionHandler
+        equity_curve, fills = _simulate(
+            prices, signals.astype(np.int8), initial_equity,
+            ib.COMMISSION_PER_SHARE, ib.MIN_COMMISSION,
+            ib.MAX_COMMISSION_PCT
+        )
+        self.portfolio_handler.portfolio.record_fills(
+            fills, tickers, prices[-1]
+        )
+        self.statistics.update_batch(
+            timestamps, equity_curve, dict(zip(tickers, prices.T))
+        )
+        if self.verbose:
+            print("Backtest completed with %d fills." % len(fills))
+
+    def simulate_trading(self, filename=None, verbose=False, plot=False):
         """
         Simulates the backtest and outputs portfolio performance.
+
+        Nothing is printed unless verbose, and the results are only
+        plotted (to filename) when plot is set, so that many backtests
+        can be run in a loop cheaply.
         """
         self.filename = filename
-        self._run_backtest()
+        self.verbose = verbose
+        if verbose:
+            print("Running Backtest...")
+        if getattr(self.strategy, 'vectorized', False):
+            self._run_backtest_vectorized()
+        else:
+            self._run_backtest()
         results = self.statistics.get_results()
 
-        print (results)
-        print("---------------------------------")
-        print("Backtest complete.")
-        print("Sharpe Ratio: %s" % results["sharpe"])
-        print("Max Drawdown: %s" % results["max_drawdown"])
-        print("Max Drawdown Pct: %s" % results["max_drawdown_pct"])
-        if not testing:
+        if verbose:
+            print (results)
+            print("---------------------------------")
+            print("Backtest complete.")
+            print("Sharpe Ratio: %s" % results["sharpe"])
+            print("Max Drawdown: %s" % results["max_drawdown"])
+            print("Max Drawdown Pct: %s" % results["max_drawdown_pct"])
+        if plot:
             self.statistics.plot_results(filename)
-            print("Written the result in:",filename)
+            if verbose:
+                print("Written the result in:",filename)
         return ""
@@ -1,12 +1,7 @@
 from __future__ import print_function
 
-from common.compat import queue
 from common.compat import queue
 from environment.event import EventType
-from common.PropertyReader import *
-from dateutil import parser
-import json
-import smarttrader.indicators.TopoSort as topoSort
 
 class Backtest(object):
     """
@@ -77,7 +72,7 @@ class Backtest(object):
                     elif event.type == EventType.FILL:
                         self.portfolio_handler.on_fill(event)
                     else:
-                        raise NotImplemented("Unsupported event.type '%s'" % event.type)
+                        raise NotImplementedError("Unsupported event.type '%s'" % event.type)
 
     def simulate_trading(self, filename=None,testing=False):
         """
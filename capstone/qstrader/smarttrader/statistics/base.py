@@ -31,6 +31,15 @@ class AbstractStatistics(object):
         """
         raise NotImplementedError("Should implement update()")
 
+    def update_batch(self, timestamps, equity, closes=None):
+        """
+        Update all the statistics with a whole equity curve at once,
+        one equity value per timestamp, with the close prices of each
+        ticker at the same timestamps in closes. This is called by the
+        vectorised backtest instead of update.
+        """
+        raise NotImplementedError("Should implement update_batch()")
+
     @abstractmethod
     def get_results(self):
         """
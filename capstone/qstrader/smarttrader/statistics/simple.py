@@ -42,6 +42,13 @@ class SimpleStatistics(AbstractStatistics):
         current_equity = PriceParser.display(portfolio_handler.portfolio.equity)
         self.hwm = [current_equity]
         self.equity.append(current_equity)
+        # Running count, mean and sum of squared deviations of
+        # equity_returns (Welford), and the largest drawdown, so the
+        # results never need another pass over the series
+        self._n = 1
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._max_drawdown = 0
 
     def update(self, timestamp, portfolio_handler):
         """
@@ -55,10 +62,51 @@ class SimpleStatistics(AbstractStatistics):
 
             # Calculate percentage return between current and previous equity value.
             pct = ((self.equity[-1] - self.equity[-2]) / self.equity[-1]) * 100
-            self.equity_returns.append(round(pct, 4))
+            ret = round(pct, 4)
+            self.equity_returns.append(ret)
+            self._n += 1
+            delta = ret - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (ret - self._mean)
             # Calculate Drawdown.
             self.hwm.append(max(self.hwm[-1], self.equity[-1]))
             self.drawdowns.append(self.hwm[-1] - self.equity[-1])
+            self._max_drawdown = max(self._max_drawdown, self.drawdowns[-1])
+
+    def update_batch(self, timestamps, equity, closes=None):
+        """
+        Update all statistics with a whole equity curve at once, one
+        equity value in dollars per timestamp, as the vectorised
+        backtest produces. The closes are not used.
+        """
+        equity = np.round(np.asarray(equity, dtype=np.float64), 2)
+        if len(equity) == 0:
+            return
+
+        # The same returns and drawdowns update computes, for every bar
+        previous = np.concatenate(([self.equity[-1]], equity[:-1]))
+        returns = np.round((equity - previous) / equity * 100, 4)
+        hwm = np.maximum.accumulate(
+            np.concatenate(([self.hwm[-1]], equity))
+        )[1:]
+        drawdowns = hwm - equity
+
+        # Merge the batch into the running mean and M2 (Chan et al.)
+        num_returns = len(returns)
+        batch_mean = returns.mean()
+        batch_m2 = ((returns - batch_mean) ** 2).sum()
+        total = self._n + num_returns
+        delta = batch_mean - self._mean
+        self._mean += delta * num_returns / total
+        self._m2 += batch_m2 + delta ** 2 * self._n * num_returns / total
+        self._n = total
+        self._max_drawdown = max(self._max_drawdown, drawdowns.max())
+
+        self.equity.extend(equity.tolist())
+        self.timeseries.extend(timestamps)
+        self.equity_returns.extend(returns.tolist())
+        self.hwm.extend(hwm.tolist())
+        self.drawdowns.extend(drawdowns.tolist())
 
     def get_results(self):
         """
@@ -73,7 +121,7 @@ class SimpleStatistics(AbstractStatistics):
         statistics = {}
         statistics["sharpe"] = self.calculate_sharpe()
         statistics["drawdowns"] = pd.Series(self.drawdowns, index=timeseries)
-        statistics["max_drawdown"] = max(self.drawdowns)
+        statistics["max_drawdown"] = self._max_drawdown
         statistics["max_drawdown_pct"] = self.calculate_max_drawdown_pct()
         statistics["equity"] = pd.Series(self.equity, index=timeseries)
         statistics["equity_returns"] = pd.Series(self.equity_returns, index=timeseries)
@@ -86,10 +134,16 @@ class SimpleStatistics(AbstractStatistics):
 
         Expects benchmark_return to be, for example, 0.01 for 1%
         """
-        excess_returns = pd.Series(self.equity_returns) - benchmark_return / 252
+        # Subtracting the benchmark shifts the mean of the returns
+        # but leaves their standard deviation alone
+        excess_mean = np.float64(self._mean - benchmark_return / 252)
+        if self._n > 1:
+            std = np.sqrt(self._m2 / (self._n - 1))
+        else:
+            std = np.nan
 
         # Return the annualised Sharpe ratio based on the excess daily returns
-        return round(self.annualised_sharpe(excess_returns), 4)
+        return round(np.sqrt(252) * excess_mean / std, 4)
 
     def annualised_sharpe(self, returns, N=252):
         """
@@ -44,6 +44,22 @@ class TearsheetStatistics(AbstractStatistics):
                 self.price_handler.get_last_close(self.benchmark)
             )
 
+    def update_batch(self, timestamps, equity, closes=None):
+        """
+        Record a whole equity curve at once, one equity value in
+        dollars per timestamp, as the vectorised backtest produces,
+        and the benchmark curve from its closes.
+        """
+        self.equity.update(zip(timestamps, np.round(equity, 2)))
+        if self.benchmark is not None:
+            if closes is None or self.benchmark not in closes:
+                raise ValueError(
+                    "No closes for the benchmark %s" % self.benchmark
+                )
+            self.equity_benchmark.update(
+                zip(timestamps, np.round(closes[self.benchmark], 2))
+            )
+
     def get_results(self):
         """
         Return a dict with all important results & stats.
@@ -103,6 +119,7 @@ class TearsheetStatistics(AbstractStatistics):
         a = []
 
         if len(pos) == 0 :
+            self.portfolio_handler.portfolio.mark_positions()
             for ticker in self.portfolio_handler.portfolio.positions :
                 print "IIIII",ticker
                 a.append(self.portfolio_handler.portfolio.positions[ticker].__dict__)
@@ -16,6 +16,9 @@ class AbstractStrategy(object):
 
     __metaclass__ = ABCMeta
 
+    # Set by strategies that can also run in the vectorised backtest
+    vectorized = False
+
     @abstractmethod
     def calculate_signals(self, event, agent=None):
         """
@@ -23,6 +26,16 @@ class AbstractStrategy(object):
         """
         raise NotImplementedError("Should implement calculate_signals()")
 
+    def calculate_signals_vectorized(self, prices, agent=None):
+        """
+        Calculates the signals of the whole backtest at once from the
+        (num_bars, num_tickers) close prices. Returns an int8 array of
+        the same shape: 1 to go long, -1 to exit and 0 to do nothing.
+        """
+        raise NotImplementedError(
+            "Should implement calculate_signals_vectorized()"
+        )
+
 
 class Strategies(AbstractStrategy):
     """
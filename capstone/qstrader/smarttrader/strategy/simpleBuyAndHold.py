@@ -1,3 +1,4 @@
+import numpy as np
 from environment.event import (SignalEvent, EventType)
 
 from .base import AbstractStrategy
@@ -9,10 +10,11 @@ class Strategy(AbstractStrategy):
     assets upon first receipt of the relevant bar event and
     then holds until the completion of a backtest.
     """
-    def __init__(self, tickers, events_queue):
+    def __init__(self, tickers, events_queue, vectorized=False):
 
         self.tickers = tickers
         self.events_queue = events_queue
+        self.vectorized = vectorized
         self.ticks = 0
         self.invested = False
         self.learning_indictors = list()
@@ -27,3 +29,12 @@ class Strategy(AbstractStrategy):
                 self.events_queue.put(signal)
                 self.invested = True
                 self.ticks += 1
+
+    def calculate_signals_vectorized(self, prices, agent=None):
+
+        # Go long on the first bar that has a price, then hold
+        signals = np.zeros(prices.shape, dtype=np.int8)
+        priced = prices > 0.0
+        columns = np.nonzero(priced.any(axis=0))[0]
+        signals[priced.argmax(axis=0)[columns], columns] = 1
+        return signals